@@ -25,6 +25,7 @@ Import the `generate_latex_report` function and call it with the necessary argum
 
 Dependencies:
 - pandas: For handling publication data in DataFrame format.
+- numpy: For computing citation statistics.
 - datetime: To include the current date in the report.
 
 Author: C. Sánchez Muñoz
@@ -33,9 +34,18 @@ Date: January 2025
 
 
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 
+# LaTeX template for a single entry of the papers list
+LATEX_ITEM_TEMPLATE = (
+    " \\item \\emph{{{title}}}.\\\\ \n"
+    "{{{authors}}}\\\\ \n"
+    "  \\href{{{url}}}{{{{{reference} ({year})}}}}\n\n"
+)
+
+
 def generate_latex_report(df_papers, name, output_file,   journals_to_count = ["Nature Photonics", "Nature Communications", "Nature Materials", "Science Advances",
         "Physical Review Letters", "PRX", "PRX Quantum"]):
     """
@@ -65,75 +75,61 @@ def generate_latex_report(df_papers, name, output_file,   journals_to_count = ["
 
     """
      
-    # Initialize counters
-    peer_reviewed_count = 0
-    first_author_count = 0
-    last_author_count = 0
-    journal_counts = {journal.lower(): {"count": 0, "first_author": 0, "last_author": 0} for journal in journals_to_count}
-    
-    # Start the LaTeX snippet for papers list
-    latex_snippet = "\\begin{enumerate}\n"
-
-    # Initialize citation and h-index calculations
-    total_citations = 0
-    citation_counts = []
-
-    # Iterate through each row in the DataFrame to format the paper details (only non-arxiv)
-    for _, row in df_papers[df_papers['isarxiv'] == False].iterrows():
-        title = row['title']
-        authors = row['authors']  # Do not bold the name yet
-        reference = row['reference'].title()
-        year = row['year']
-        url = row['url']
-        journal_title = row['journal']
-        citations = row['citations']
-
-        # Increment peer-reviewed count
-        peer_reviewed_count += 1
-        citation_counts.append(citations)
-        total_citations += citations
-
-        # Split authors into a list and check for first and last author
-        authors_list = [author.strip() for author in authors.split(',')]  # Remove extra spaces
-        is_first_author = authors_list[0] == name
-        is_last_author = authors_list[-1] == name
-
-        # Count first and last authors
-        if is_first_author:
-            first_author_count += 1
-            if journal_title.lower() in journal_counts:
-                journal_counts[journal_title.lower()]["first_author"] += 1
-        if is_last_author:
-            last_author_count += 1
-            if journal_title.lower() in journal_counts:
-                journal_counts[journal_title.lower()]["last_author"] += 1
-
-        # Normalize the journal name to check for matches in the list (case-insensitive)
-        journal_lower = journal_title.lower()
-        if journal_lower in journal_counts:
-            journal_counts[journal_lower]["count"] += 1
-
-        # After counting, bolden the scholar's name in the authors list
-        authors_bolded = authors.replace(name, f"\\textbf{{{name}}}")
-
-        # Format the entry for this paper
-        latex_snippet += (
-            f" \\item \\emph{{{title}}}.\\\\ \n"
-            f"{{{authors_bolded}}}\\\\ \n"
-            f"  \\href{{{url}}}{{{{{reference} ({year})}}}}\n\n"
-        )
+    # Start the LaTeX snippet for papers list (collected in a list of parts, written at the end)
+    latex_parts = ["\\begin{enumerate}\n"]
+
+    # Bolden the scholar's name in the authors list of all papers at once (on a copy of the DataFrame)
+    bold_name = f"\\textbf{{{name}}}"
+    df_papers = df_papers.assign(
+        authors_bolded=df_papers['authors'].str.replace(name, bold_name, regex=False)
+    )
+
+    # Select the columns of the peer-reviewed (non-arxiv) papers once, as plain arrays,
+    # to avoid building a pandas Series for every row
+    isarxiv = df_papers['isarxiv'].astype(bool)
+    df_peer = df_papers.loc[~isarxiv]
+    peer_columns = df_peer[['title', 'authors_bolded', 'year', 'url']].to_numpy()
+    peer_references = df_peer['reference'].str.title().to_numpy()
+
+    # Count peer-reviewed papers, and first and last authorships (column-wise, without a Python loop,
+    # and splitting only on the first and last commas instead of building the full list of authors)
+    peer_reviewed_count = len(df_peer)
+    first_author_mask = df_peer['authors'].str.split(',', n=1).str[0].str.strip() == name
+    last_author_mask = df_peer['authors'].str.rsplit(',', n=1).str[-1].str.strip() == name
+    first_author_count = int(first_author_mask.sum())
+    last_author_count = int(last_author_mask.sum())
+
+    # Count papers in each journal (case-insensitive), and first and last authorships in them.
+    # Journal names are stored as categories, so that grouping works on integer codes
+    journal_stats = pd.DataFrame({
+        'journal': df_peer['journal'].str.lower().astype('category'),
+        'first_author': first_author_mask,
+        'last_author': last_author_mask,
+    }).groupby('journal', observed=True).agg(
+        count=('first_author', 'size'),
+        first_author=('first_author', 'sum'),
+        last_author=('last_author', 'sum'),
+    ).to_dict('index')
+
+    # Keep the counts of the tracked journals
+    no_counts = {"count": 0, "first_author": 0, "last_author": 0}
+    journal_counts = {journal.lower(): journal_stats.get(journal.lower(), no_counts) for journal in journals_to_count}
+
+    # Format the entries of the peer-reviewed papers with the fixed item template
+    latex_parts.extend(
+        LATEX_ITEM_TEMPLATE.format(title=title, authors=authors_bolded, reference=reference, year=year, url=url)
+        for (title, authors_bolded, year, url), reference in zip(peer_columns, peer_references)
+    )
 
     # End the enumerate environment for peer-reviewed papers
-    latex_snippet += "\\end{enumerate}\n"
+    latex_parts.append("\\end{enumerate}\n")
 
-    # Calculate the h-index (simplified version)
-    sorted_citations = sorted(citation_counts, reverse=True)
-    h_index = 0
-    for i, citation in enumerate(sorted_citations):
-        if citation >= i + 1:
-            h_index = i + 1
-        else:
-            break
+    # Sort citations in descending order: the h-index is the number of papers whose citations
+    # are at least equal to their rank
+    sorted_citations = np.sort(df_peer['citations'].to_numpy())[::-1]
+    ranks = np.arange(1, sorted_citations.size + 1)
+    h_index = int((sorted_citations >= ranks).sum())
+    total_citations = int(sorted_citations.sum())
 
     # Generate statistics report
     current_date = datetime.now().strftime("%B %d, %Y")
@@ -144,12 +140,12 @@ def generate_latex_report(df_papers, name, output_file,   journals_to_count = ["
     # Generate the journal counts for the specified journals
     journal_report = []
     for journal in journals_to_count:
-        journal_lower = journal.lower()
-        if journal_counts[journal_lower]["count"] > 0:
-            first_author_count_journal = journal_counts[journal_lower]["first_author"]
-            last_author_count_journal = journal_counts[journal_lower]["last_author"]
+        counts = journal_counts[journal.lower()]
+        if counts["count"] > 0:
+            first_author_count_journal = counts["first_author"]
+            last_author_count_journal = counts["last_author"]
             # Include journal information based on counts
-            journal_str = f"{journal_counts[journal_lower]['count']} {journal}"
+            journal_str = f"{counts['count']} {journal}"
             if first_author_count_journal > 0 and last_author_count_journal > 0:
                 journal_str += f" ({first_author_count_journal} first author, {last_author_count_journal} last author)"
             elif first_author_count_journal > 0:
@@ -166,32 +162,23 @@ def generate_latex_report(df_papers, name, output_file,   journals_to_count = ["
     statistics_text += f"\\textbf{{h-index: {h_index}. Citations: {total_citations}}} (Google Scholar, as of {current_date})."
 
     # Append the preprints section
-    latex_snippet += "\n\\begin{center}\n\\textsc{Preprints}\n\\end{center}\n"
-    latex_snippet += "\\begin{enumerate}\n"
-
-    # Iterate through preprints (arxiv)
-    for _, row in df_papers[df_papers['isarxiv'] == True].iterrows():
-        title = row['title']
-        authors = row['authors']
-        reference = row['reference']
-        year = row['year']
-        url = row['url']
-
-        # Bolden the scholar's name in the authors list
-        authors_bolded = authors.replace(name, f"\\textbf{{{name}}}")
-
-        # Format the entry for the preprint
-        latex_snippet += (
-            f" \\item \\emph{{{title}}}.\\\\ \n"
-            f"{{{authors_bolded}}}\\\\ \n"
-            f"  \\href{{{url}}}{{{{{reference} ({year})}}}}\n\n"
-        )
+    latex_parts.append("\n\\begin{center}\n\\textsc{Preprints}\n\\end{center}\n")
+    latex_parts.append("\\begin{enumerate}\n")
+
+    # Format the entries of the preprints (arxiv) with the same item template
+    preprint_columns = df_papers.loc[isarxiv, ['title', 'authors_bolded', 'reference', 'year', 'url']].to_numpy()
+    latex_parts.extend(
+        LATEX_ITEM_TEMPLATE.format(title=title, authors=authors_bolded, reference=reference, year=year, url=url)
+        for title, authors_bolded, reference, year, url in preprint_columns
+    )
 
     # End the enumerate environment for preprints
-    latex_snippet += "\\end{enumerate}\n"
+    latex_parts.append("\\end{enumerate}\n")
 
-    # Save the final LaTeX report to a file
-    with open(output_file, "w") as f:
-        f.write(statistics_text + "\n\n" + latex_snippet)
+    # Save the final LaTeX report to a file (with a large write buffer, writing the parts directly)
+    with open(output_file, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(statistics_text)
+        f.write("\n\n")
+        f.writelines(latex_parts)
 
     print(f"Report saved to {output_file}")
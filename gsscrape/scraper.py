@@ -3,8 +3,9 @@ scraper.py
 ----------
 
 This script provides tools to scrape publication data from Google Scholar for a specific user. It uses Selenium 
-to interact with the Google Scholar interface, navigate through pages, and extract detailed publication 
-information, including title, authors, journal, citations, and year of publication.
+to interact with the Google Scholar interface and load the full list of publications, and requests to download 
+the detailed publication pages, extracting information including title, authors, journal, citations, and year 
+of publication.
 
 Key Features:
 -------------
@@ -23,8 +24,10 @@ Functions:
 2. format_names(name_string):
    Formats a list of author names by capitalizing and punctuating initials.
 
-3. getGSdata(scholarUserId, name, pseudonyms):
+3. getGSdata(scholarUserId, name, pseudonyms, max_workers=8):
    Scrapes Google Scholar for a specified user and returns a pandas DataFrame with the extracted data.
+   The list of publications is loaded with Selenium, and the detailed page of each publication is
+   downloaded with requests, using up to `max_workers` concurrent downloads.
 
 CLI Functionality:
 ------------------
@@ -40,12 +43,16 @@ Arguments:
     --name       : The canonical author name (e.g., 'C. Sánchez Muñoz') to highlight in the authors' list.
     --pseudonyms : A list of alternate author names (pseudonyms) to unify under the canonical name.
     --output     : The name of the output CSV file (default: papers.csv).
+    --skip_failed: Leave out the papers whose details could not be extracted, instead of failing.
 
 Dependencies:
 -------------
 - pandas: For handling publication data in tabular format.
+- numpy: For storing numeric publication data with compact dtypes.
 - selenium: For automating browser interactions.
-- time: To handle delays during browser operations.
+- requests: For downloading the detailed publication pages.
+- lxml: For parsing the detailed publication pages.
+- time: To wait before retrying failed downloads.
 
 Usage Example:
 --------------
@@ -85,6 +92,8 @@ Usage Example:
        A list of pseudonyms to unify (e.g., 'C S Munoz', 'C S Muñoz').
    --output : str (optional)
        The name of the output CSV file (default: 'papers.csv').
+   --skip_failed : flag (optional)
+       Leave out the papers whose details could not be extracted, instead of failing.
 
    This method is ideal for quick data extraction without writing additional Python scripts.
    
@@ -94,14 +103,48 @@ Author:
 C. Sánchez Muñoz, January 2025
 """
 
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import lxml.html
+import numpy as np
 import pandas as pd
+import requests
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 import argparse
 
 
+# HTTP status codes of transient errors, for which a download is retried
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# Columns of the papers DataFrame, and dtypes of the numeric and boolean ones (the others hold Python objects)
+PAPER_COLUMNS = ['title', 'authors', 'reference', 'journal', 'year', 'citations', 'url', 'citationsyears', 'isarxiv']
+PAPER_DTYPES = {'year': np.int32, 'citations': np.int32, 'isarxiv': bool}
+
+
+class ScholarBlockedError(Exception):
+    """
+    Raised when Google Scholar blocks a request (e.g., with a captcha or a "too many requests" response).
+    """
+
+
+@lru_cache(maxsize=None)
+def _compile_pseudonyms(pseudonyms):
+    """
+    Compiles a tuple of pseudonyms into a single regular expression matching any of them.
+
+    Longer pseudonyms are placed first in the alternation, so that they take precedence over
+    shorter pseudonyms that are prefixes of them.
+    """
+    return re.compile("|".join(map(re.escape, sorted(pseudonyms, key=len, reverse=True))))
+
 
 def unify_pseudonyms(input_string,pseudonyms,name):
     """
@@ -115,15 +158,19 @@ def unify_pseudonyms(input_string,pseudonyms,name):
     Returns:
         str: The modified string with pseudonyms replaced by the standardized name.
     """
-    for pseudonym in pseudonyms:
-        input_string = input_string.replace(pseudonym, name)
-    return input_string
+    if not pseudonyms:
+        return input_string
+    pattern = _compile_pseudonyms(tuple(pseudonyms))
+    return pattern.sub(lambda match: name, input_string)
 
 
+@lru_cache(maxsize=4096)
 def format_names(name_string):
     """
     Formats a string of names by adding periods to initials and capitalizing them.
 
+    Results are cached, since the same author strings are typically formatted many times.
+
     Args:
         name_string (str): A string containing names separated by commas.
 
@@ -136,9 +183,13 @@ def format_names(name_string):
     # Process each name
     formatted_names = []
     for name in names:
-        # Extract the surname and initials
-        surname = " ".join(name.split(" ")[1:])
-        initials = name.split(" ")[0]
+        # Extract the surname and initials (splitting the name only once)
+        initials, _, surname = name.partition(" ")
+
+        # Keep names whose initials are already punctuated (e.g., the canonical name unified from a pseudonym)
+        if initials.endswith('.'):
+            formatted_names.append(name)
+            continue
         
         # Check if the first part is a full name (criterion: three or more letters)
         isname = len(initials)>= 3
@@ -157,12 +208,109 @@ def format_names(name_string):
     return ", ".join(formatted_names)
 
 
-def getGSdata(scholarUserId, name, pseudonyms):
+def _papers_dataframe(columns):
+    """
+    Builds the papers DataFrame from the collected columns, with explicit dtypes for every column.
+
+    Text columns are explicitly stored as objects, so that they keep supporting the `.str` accessor
+    even when no papers were collected.
+
+    Args:
+        columns (dict): A mapping from each name in `PAPER_COLUMNS` to the list of its values.
+
+    Returns:
+        pd.DataFrame: The papers DataFrame.
+    """
+    return pd.DataFrame({
+        column: pd.Series(columns[column], dtype=PAPER_DTYPES.get(column, object)) for column in PAPER_COLUMNS
+    })
+
+
+def _more_papers_loaded(npapersOld):
+    """
+    Builds a Selenium wait condition that is met once more than `npapersOld` papers are displayed.
+
+    Args:
+        npapersOld (int): The number of papers displayed before loading more.
+
+    Returns:
+        callable: A condition for `WebDriverWait.until`, returning the new number of papers once it is met.
+    """
+    def condition(driver):
+        npapers = len(driver.find_elements(By.CLASS_NAME, "gsc_a_tr"))
+        return npapers if npapers > npapersOld else False
+    return condition
+
+
+def _fetch_paper_details(session, gslink, retries=3, backoff=2.0):
+    """
+    Downloads the Google Scholar page of a paper and extracts its detailed information.
+
+    Transient errors (connection errors, timeouts, blocked requests and server errors) are retried
+    with an exponential backoff.
+
+    Args:
+        session (requests.Session): The HTTP session used to download the page.
+        gslink (str): The URL of the Google Scholar page of the paper.
+        retries (int): The maximum number of retries after a transient error.
+        backoff (float): The waiting time (in seconds) before the first retry, doubled for each further retry.
+
+    Returns:
+        tuple: The link to the paper, the list of citations per year, the journal title and the authors.
+
+    Raises:
+        ScholarBlockedError: If Google Scholar still blocks the request after all retries.
+        requests.RequestException: If the page cannot be downloaded.
+        ValueError: If the page does not contain the expected paper information.
+    """
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            response = session.get(gslink, timeout=30)
+        except (requests.ConnectionError, requests.Timeout) as error:
+            lastError = error
+            continue
+        if '/sorry/' in response.url or 'gs_captcha' in response.text:
+            lastError = ScholarBlockedError(f"Google Scholar answered with a captcha for {gslink}")
+            continue
+        if response.status_code == 429:
+            lastError = ScholarBlockedError(f"Google Scholar rejected too many requests for {gslink} (HTTP 429)")
+            continue
+        if response.status_code in RETRY_STATUS_CODES:
+            lastError = requests.HTTPError(f"HTTP {response.status_code} for {gslink}", response=response)
+            continue
+        response.raise_for_status()
+        break
+    else:
+        raise lastError
+
+    # Decode the page with the charset of the HTTP headers, falling back to UTF-8 (lxml alone would
+    # decode pages without a <meta charset> as Latin-1, garbling accented names)
+    contentType = response.headers.get('Content-Type', '')
+    encoding = response.encoding if 'charset' in contentType.lower() else 'utf-8'
+    page = lxml.html.fromstring(response.content, parser=lxml.html.HTMLParser(encoding=encoding))
+    page.make_links_absolute(gslink)
+
+    values = page.find_class('gsc_oci_value')
+    if len(values) < 3:
+        raise ValueError(f"Unexpected page layout for {gslink}: paper information not found")
+    # Fall back to the Google Scholar page for papers without an external link
+    titleLinks = page.find_class('gsc_oci_title_link')
+    paperlink = titleLinks[0].get('href') if titleLinks else gslink
+    citeyears = [element.text_content() for element in page.find_class('gsc_oci_g_al')]
+    journalTitle = values[2].text_content().title()
+    authors = values[0].text_content().title()
+
+    return paperlink, citeyears, journalTitle, authors
+
+
+def getGSdata(scholarUserId, name, pseudonyms, max_workers=8, skip_failed=False):
     """
     Scrape Google Scholar data for a given user and return it as a DataFrame.
 
-    This function interacts with Google Scholar using Selenium to scrape publication data for the specified user.
-    It handles multiple pages of results, extracts publication details, and formats the data for further analysis.
+    This function interacts with Google Scholar using Selenium to load the full list of publications for the specified
+    user, then downloads the detailed page of each publication concurrently, and formats the data for further analysis.
 
     Parameters:
     ----------
@@ -172,6 +320,11 @@ def getGSdata(scholarUserId, name, pseudonyms):
         The canonical name of the target scholar to unify pseudonyms in the authorship list.
     pseudonyms : list of str
         A list of pseudonyms to be replaced with the canonical name of the target scholar.
+    max_workers : int, optional
+        The number of detailed paper pages downloaded concurrently (default: 8).
+    skip_failed : bool, optional
+        Whether to leave out the papers whose detailed page could not be extracted, instead of raising an error
+        (default: False). Skipped papers are missing from all the statistics computed from the DataFrame.
 
     Returns:
     -------
@@ -186,6 +339,11 @@ def getGSdata(scholarUserId, name, pseudonyms):
         - URL to the publication
         - Citations per year (from the year the paper was published).
         - Whether the publication is a preprint on arXiv.
+
+    Raises:
+    ------
+    RuntimeError
+        If the detailed page of some papers could not be extracted (listing them), unless `skip_failed` is True.
     """
 
     # Set up the Firefox driver with headless mode
@@ -196,33 +354,32 @@ def getGSdata(scholarUserId, name, pseudonyms):
 
     # Open the Google Scholar page
     driver.get(urlpage)
-    time.sleep(3)   
+    try:
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "gsc_a_tr")))
+    except TimeoutException:
+        pass  # Continue with zero papers if the profile has no publications
 
-    # Initialize variables for pagination handling
-    npapersOld=0
-    updateFlag = 0
+    # Initialize the number of papers for pagination handling
+    npapersOld = len(driver.find_elements(By.CLASS_NAME, "gsc_a_tr"))
 
     # Load all publications by clicking "Show more" until no new papers are loaded
-    while(updateFlag==0):
-        papers=driver.find_elements(By.CLASS_NAME, "gsc_a_tr")
-        npapersOld = len(papers)
+    # (waiting only as long as needed for the new papers to be displayed)
+    while True:
         print("Refreshing page")
         try:
             driver.find_element(By.XPATH, "//span[text()='Mostrar más']").click()
         except Exception:
             break  # Exit loop if "Show more" button is not found
-        papers=driver.find_elements(By.CLASS_NAME, "gsc_a_tr")
-        npapers = len(papers)
-        if npapers==npapersOld:
-            updateFlag=1   
-
-    time.sleep(3)   
+        try:
+            npapersOld = WebDriverWait(driver, 5).until(_more_papers_loaded(npapersOld))
+        except TimeoutException:
+            break  # Exit loop if no new papers are loaded
 
     print("Maximum number of papers displayed on screen")
 
-    # Extract information from each paper
+    # Extract the information available in the list of papers
     papers=driver.find_elements(By.CLASS_NAME, "gsc_a_tr")
-    infoList = []
+    listInfo = []
 
     print(f'{len(papers)} papers found')
     print('Extracting information...')
@@ -237,49 +394,74 @@ def getGSdata(scholarUserId, name, pseudonyms):
         year = int(paper.find_element(By.CLASS_NAME, "gsc_a_y").text)
         
         # Extract citation count (default to 0 if not available)
-        try:
-            citations = int(paper.find_element(By.CLASS_NAME, "gsc_a_ac").text)
-        except:
-            citations = 0
-
-        # Save the handle of the original window
-        original_window = driver.current_window_handle
-
-        # Open a new window and switch to it
-        driver.execute_script("window.open('');")
-        time.sleep(1)  # Wait for the new window to open
-        new_window = [window for window in driver.window_handles if window != original_window][0]
-        driver.switch_to.window(new_window)
-
-        # Open the detailed paper page and extract additional information
-        driver.get(gslink)
-        paperlink = driver.find_element(By.CLASS_NAME,'gsc_oci_title_link').get_attribute('href')
-        citegraphs = driver.find_elements(By.CLASS_NAME,'gsc_oci_g_al')
-        citeyears=[element.get_attribute("innerHTML") for element in citegraphs]
-        journalTitle = driver.find_elements(By.CLASS_NAME,'gsc_oci_value')[2].text.title()
-        authors = driver.find_elements(By.CLASS_NAME,'gsc_oci_value')[0].text.title()
+        citationElements = paper.find_elements(By.CLASS_NAME, "gsc_a_ac")
+        citationText = citationElements[0].text if citationElements else ''
+        citations = int(citationText) if citationText.isdigit() else 0
+
+        listInfo.append((title, gslink, reference, year, citations))
+
+    # Reuse the browser identity (user agent and cookies) to download the detailed paper pages
+    userAgent = driver.execute_script("return navigator.userAgent;")
+    cookies = {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}
+    driver.quit()
+
+    # Download and parse the detailed paper pages concurrently, reusing the connections
+    # of a single session (with one pooled connection per worker) for all papers
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        session.headers["User-Agent"] = userAgent
+        session.cookies.update(cookies)
+        session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=max_workers))
+        futures = [executor.submit(_fetch_paper_details, session, info[1]) for info in listInfo]
+
+        # Collect the details of each paper, keeping track of the papers that could not be extracted
+        detailsList = []
+        failures = []
+        for (title, *_), future in zip(listInfo, futures):
+            try:
+                detailsList.append(future.result())
+            except (ScholarBlockedError, requests.RequestException, ValueError) as error:
+                failures.append(f"'{title}': {error}")
+                detailsList.append(None)
+
+    if failures:
+        failuresText = "\n".join(f"- {failure}" for failure in failures)
+        if not skip_failed:
+            raise RuntimeError(
+                f"Could not extract the details of {len(failures)} of {len(listInfo)} papers "
+                f"(use skip_failed=True to leave them out):\n{failuresText}"
+            )
+        print(f"Skipping {len(failures)} of {len(listInfo)} papers that could not be extracted:\n{failuresText}")
+
+    # Collect the paper information column by column
+    columns = {column: [] for column in PAPER_COLUMNS}
+    for (title, gslink, reference, year, citations), details in zip(listInfo, detailsList):
+        if details is None:
+            continue
+        paperlink, citeyears, journalTitle, authors = details
 
         # Format and unify author names
-        unify_pseudonyms(authors, pseudonyms, name)
+        authors = unify_pseudonyms(authors, pseudonyms, name)
         authors_formatted = format_names(authors)
 
-        # Close the new window and return to the original
-        driver.close()
-        driver.switch_to.window(original_window)
-
         # Adjust journal and reference if the publication is on arXiv
         isarxiv = 'arxiv' in journalTitle.lower()
         if isarxiv:
             reference = 'arXiv: '+(reference.split('arXiv:')[1])
             journalTitle = 'arXiv'
 
-        # Compile paper information into a list
-        paperInfo = [title,  authors_formatted,reference, journalTitle, year, citations, paperlink, citeyears, isarxiv ]
-        infoList.append(paperInfo)
+        # Append paper information to each column
+        columns['title'].append(title)
+        columns['authors'].append(authors_formatted)
+        columns['reference'].append(reference)
+        columns['journal'].append(journalTitle)
+        columns['year'].append(year)
+        columns['citations'].append(citations)
+        columns['url'].append(paperlink)
+        columns['citationsyears'].append(citeyears)
+        columns['isarxiv'].append(isarxiv)
 
-    driver.quit()
-    # Create a DataFrame from the collected information
-    df_papers = pd.DataFrame(infoList, columns=['title', 'authors',  'reference','journal', 'year','citations', 'url', 'citationsyears', 'isarxiv'])
+    # Create a DataFrame from the collected columns
+    df_papers = _papers_dataframe(columns)
 
     return df_papers
 
@@ -292,11 +474,12 @@ if __name__ == "__main__":
     parser.add_argument("--name", required=True, help="Author name to unify (e.g., 'C. Sánchez Muñoz')")
     parser.add_argument("--pseudonyms", nargs="+", required=True, help="List of pseudonyms to replace with the author's name")
     parser.add_argument("--output", default="papers.csv", help="Output CSV file (default: papers.csv)")
+    parser.add_argument("--skip_failed", action="store_true", help="Leave out papers whose details could not be extracted, instead of failing")
     
     args = parser.parse_args()
     
     # Run the scraper
-    df_papers = getGSdata(scholarUserId=args.scholar_id, name=args.name, pseudonyms=args.pseudonyms)
+    df_papers = getGSdata(scholarUserId=args.scholar_id, name=args.name, pseudonyms=args.pseudonyms, skip_failed=args.skip_failed)
     
     # Save results to a CSV file
     df_papers.to_csv(args.output, index=False)
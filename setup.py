@@ -10,9 +10,14 @@ setuptools.setup(
     description="A package to scrape your papers from Google Scholar",
     packages=setuptools.find_packages(where='src'),
     install_requires=[
+        "lxml",
+        "numpy",
         "pandas",
-        "jupyter",      
-        "selenium===4.27.1"
+        "requests",
+        "selenium==4.27.1"
     ],
+    extras_require={
+        "notebook": ["jupyter"],
+    },
     python_requires=">=3.9",
 )
\ No newline at end of file
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from gsscrape.reporter import generate_latex_report
+
+
+NAME = "C. Sánchez Muñoz"
+COLUMNS = ['title', 'authors', 'reference', 'journal', 'year', 'citations', 'url', 'citationsyears', 'isarxiv']
+
+
+def make_papers(rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def make_report(tmp_path, df_papers):
+    output_file = tmp_path / "report.tex"
+    generate_latex_report(df_papers, NAME, output_file)
+    return output_file.read_text(encoding="utf-8")
+
+
+@pytest.fixture
+def df_papers():
+    return make_papers([
+        # First author, tracked journal
+        ["Paper A", f"{NAME}, A. B", "phys. rev. lett. 1, 2", "Physical Review Letters", 2024, 10, "https://a", [], False],
+        # Last author, same tracked journal with a different case
+        ["Paper B", f"A. B, {NAME}", "phys. rev. lett. 3, 4", "physical review letters", 2023, 5, "https://b", [], False],
+        # Middle author, tracked journal
+        ["Paper C", f"A. B, {NAME}, D. E", "prx 5, 6", "PRX", 2022, 3, "https://c", [], False],
+        # Single author (first and last), untracked journal
+        ["Paper D", NAME, "opt. express 7, 8", "Optics Express", 2021, 1, "https://d", [], False],
+        # Preprint, left out of all the statistics
+        ["Paper E", f"{NAME}, X. Y", "arXiv: 2401.00001", "arXiv", 2024, 100, "https://e", [], True],
+    ])
+
+
+def test_author_counts(tmp_path, df_papers):
+    report = make_report(tmp_path, df_papers)
+    assert "4 peer-reviewed publications, 2 papers as first author, 2 papers as last author." in report
+
+
+def test_journal_counts_ignore_case(tmp_path, df_papers):
+    report = make_report(tmp_path, df_papers)
+    assert "These include 2 Physical Review Letters (1 first author, 1 last author), 1 PRX.\n" in report
+
+
+def test_h_index_and_citations(tmp_path, df_papers):
+    report = make_report(tmp_path, df_papers)
+    assert "\\textbf{h-index: 3. Citations: 19}" in report
+
+
+def test_paper_entries(tmp_path, df_papers):
+    report = make_report(tmp_path, df_papers)
+    assert (
+        " \\item \\emph{Paper A}.\\\\ \n"
+        "{\\textbf{C. Sánchez Muñoz}, A. B}\\\\ \n"
+        "  \\href{https://a}{{Phys. Rev. Lett. 1, 2 (2024)}}\n\n"
+    ) in report
+    assert (
+        " \\item \\emph{Paper E}.\\\\ \n"
+        "{\\textbf{C. Sánchez Muñoz}, X. Y}\\\\ \n"
+        "  \\href{https://e}{{arXiv: 2401.00001 (2024)}}\n\n"
+    ) in report
+    assert report.index("Paper D") < report.index("\\textsc{Preprints}") < report.index("Paper E")
+    assert "authors_bolded" not in df_papers.columns
+
+
+def test_only_preprints(tmp_path, df_papers):
+    report = make_report(tmp_path, df_papers[df_papers['isarxiv']])
+    assert "0 peer-reviewed publications, 0 papers as first author, 0 papers as last author." in report
+    assert "These include" not in report
+    assert "\\textbf{h-index: 0. Citations: 0}" in report
+    assert "\\emph{Paper E}" in report
+
+
+def test_no_papers(tmp_path):
+    report = make_report(tmp_path, make_papers([]))
+    assert "0 peer-reviewed publications, 0 papers as first author, 0 papers as last author." in report
+    assert "\\textbf{h-index: 0. Citations: 0}" in report
+    assert report.endswith("\\begin{enumerate}\n\\end{enumerate}\n")
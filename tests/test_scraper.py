@@ -0,0 +1,140 @@
+import pytest
+import requests
+
+from gsscrape.reporter import generate_latex_report
+from gsscrape.scraper import (
+    PAPER_COLUMNS,
+    ScholarBlockedError,
+    _fetch_paper_details,
+    _papers_dataframe,
+    format_names,
+    unify_pseudonyms,
+)
+
+
+NAME = "C. Sánchez Muñoz"
+PSEUDONYMS = ["C S Munoz", "C S Muñoz", "C Sánchez-Muñoz"]
+
+
+def test_format_names_punctuates_initials():
+    assert format_names("Carlos Sánchez Muñoz, Cs Munoz, A Vivas-Viaña") == "C. Sánchez Muñoz, C.S. Munoz, A. Vivas-Viaña"
+
+
+def test_format_names_keeps_punctuated_initials():
+    assert format_names(NAME) == NAME
+
+
+def test_unified_pseudonym_is_formatted_as_name():
+    for pseudonym in PSEUDONYMS:
+        assert format_names(unify_pseudonyms(pseudonym, PSEUDONYMS, NAME)) == NAME
+
+
+def test_unified_authors_are_formatted():
+    authors = unify_pseudonyms("A Vivas-Viaña, C Sánchez-Muñoz", PSEUDONYMS, NAME)
+    assert format_names(authors) == "A. Vivas-Viaña, C. Sánchez Muñoz"
+
+
+def test_empty_papers_dataframe_passes_through_report(tmp_path):
+    df_papers = _papers_dataframe({column: [] for column in PAPER_COLUMNS})
+    assert df_papers['authors'].dtype == object
+
+    output_file = tmp_path / "report.tex"
+    generate_latex_report(df_papers, NAME, output_file)
+    report = output_file.read_text(encoding="utf-8")
+    assert "0 peer-reviewed publications" in report
+    assert "h-index: 0. Citations: 0" in report
+
+
+PAPER_PAGE = (
+    "<html><body>"
+    "<a class='gsc_oci_title_link' href='https://example.org/paper'>Paper</a>"
+    "<div class='gsc_oci_value'>C Sanchez-Munoz, A Vivas-Viana</div>"
+    "<div class='gsc_oci_value'>2024/1/1</div>"
+    "<div class='gsc_oci_value'>Physical Review Letters</div>"
+    "<span class='gsc_oci_g_al'>3</span><span class='gsc_oci_g_al'>5</span>"
+    "</body></html>"
+)
+GSLINK = "https://scholar.google.es/citations?view_op=view_citation&citation_for_view=X"
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200, url=GSLINK, charset="utf-8"):
+        self.text = text
+        self.content = text.encode(charset or "utf-8")
+        self.status_code = status_code
+        self.url = url
+        self.headers = {"Content-Type": f"text/html; charset={charset}" if charset else "text/html"}
+        self.encoding = charset or "ISO-8859-1"
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, timeout):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def test_fetch_paper_details_parses_page():
+    session = FakeSession([FakeResponse(PAPER_PAGE)])
+    paperlink, citeyears, journalTitle, authors = _fetch_paper_details(session, GSLINK, backoff=0)
+    assert paperlink == "https://example.org/paper"
+    assert citeyears == ["3", "5"]
+    assert journalTitle == "Physical Review Letters"
+    assert authors == "C Sanchez-Munoz, A Vivas-Viana"
+
+
+def test_fetch_paper_details_retries_transient_errors():
+    session = FakeSession([
+        requests.ConnectionError("connection reset"),
+        FakeResponse("", status_code=429),
+        FakeResponse("", status_code=503),
+        FakeResponse(PAPER_PAGE),
+    ])
+    assert _fetch_paper_details(session, GSLINK, retries=3, backoff=0)[3] == "C Sanchez-Munoz, A Vivas-Viana"
+    assert session.calls == 4
+
+
+def test_fetch_paper_details_raises_after_captcha():
+    captcha = FakeResponse("<form id='gs_captcha_f'></form>")
+    session = FakeSession([captcha, captcha])
+    with pytest.raises(ScholarBlockedError, match="captcha"):
+        _fetch_paper_details(session, GSLINK, retries=1, backoff=0)
+    assert session.calls == 2
+
+
+def test_fetch_paper_details_raises_after_too_many_requests():
+    session = FakeSession([FakeResponse("", status_code=429, url="https://www.google.com/sorry/index")] * 2)
+    with pytest.raises(ScholarBlockedError):
+        _fetch_paper_details(session, GSLINK, retries=1, backoff=0)
+
+
+def test_fetch_paper_details_does_not_retry_client_errors():
+    session = FakeSession([FakeResponse("", status_code=404)])
+    with pytest.raises(requests.HTTPError):
+        _fetch_paper_details(session, GSLINK, retries=3, backoff=0)
+    assert session.calls == 1
+
+
+def test_fetch_paper_details_rejects_unexpected_page():
+    session = FakeSession([FakeResponse("<html><body>Nothing here</body></html>")])
+    with pytest.raises(ValueError, match="Unexpected page layout"):
+        _fetch_paper_details(session, GSLINK, backoff=0)
+
+
+@pytest.mark.parametrize("charset", ["utf-8", "iso-8859-1", None])
+def test_fetch_paper_details_decodes_accented_names(charset):
+    page = PAPER_PAGE.replace("C Sanchez-Munoz", "C Sánchez-Muñoz")
+    session = FakeSession([FakeResponse(page, charset=charset)])
+    authors = _fetch_paper_details(session, GSLINK, backoff=0)[3]
+    assert authors == "C Sánchez-Muñoz, A Vivas-Viana"
+    assert unify_pseudonyms(authors, PSEUDONYMS, NAME) == "C. Sánchez Muñoz, A Vivas-Viana"